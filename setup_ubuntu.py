@@ -7,171 +7,424 @@ Shows progress, per-step success/failure, and a final summary.
 
 from __future__ import annotations
 
+import getpass
 import os
+import pwd
 import re
+import shlex
+import socket
 import subprocess
 import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Callable
+from pathlib import Path
+from typing import Callable, Sequence
 
 HOME = os.path.expanduser("~")
+USER = getpass.getuser()
+ZSH_PATH = "/usr/bin/zsh"
+GITCONFIG = Path(HOME) / ".gitconfig"
+SSH_KEY = Path(HOME) / ".ssh" / "id_ed25519"
+SSH_KEY_STR = str(SSH_KEY)
+ZSHRC = Path(HOME) / ".zshrc"
+FISH_CFG = Path(HOME) / ".config" / "fish" / "config.fish"
+
+NERD_FONT_URL = (
+    "https://github.com/ryanoasis/nerd-fonts/raw/HEAD/patched-fonts/DroidSansMono/DroidSansMNerdFont-Regular.otf"
+)
+OMZ_INSTALLER_URL = "https://raw.githubusercontent.com/ohmyzsh/ohmyzsh/master/tools/install.sh"
+OMF_INSTALLER_URL = "https://raw.githubusercontent.com/oh-my-fish/oh-my-fish/master/bin/install"
+NERD_FONT = Path(HOME) / ".local" / "share" / "fonts" / "DroidSansMNerdFont-Regular.otf"
+DOWNLOAD_DIR = Path(HOME) / ".cache" / "setup_ubuntu"
+OMZ_INSTALLER = DOWNLOAD_DIR / "omz.sh"
+OMF_INSTALLER = DOWNLOAD_DIR / "omf.fish"
+
+# Hosts the download steps talk to; cached by systemd-resolved/nscd when present
+PREWARM_HOSTS = (
+    "archive.ubuntu.com",
+    "github.com",
+    "raw.githubusercontent.com",
+    "astral.sh",
+)
+
+# Cloned into ~ and then moved to /opt
+# ssh would otherwise ask on /dev/tty to confirm github.com's host key
+GIT_SSH_COMMAND = "ssh -o BatchMode=yes -o StrictHostKeyChecking=accept-new"
+CLONE_REPOS = (
+    "git@github.com:s0m3OnE47/update-cursor.git",
+    "https://github.com/marlonrichert/zsh-autocomplete.git",
+)
+
+APT_PACKAGES = (
+    "chrome-gnome-shell", "curl", "git", "vim", "zsh", "fish",
+    "fonts-powerline", "xfce4-terminal", "nodejs", "npm", "locate", "gnome-tweaks",
+    "gnome-shell-extensions", "libfuse2t64", "build-essential", "ffmpeg", "cmake", "ranger",
+    "python3-pip", "eatmydata",
+)
+
+GIT_CONFIG = {
+    "user": {"name": "Aniket Dhere", "email": "aniket.dhere@gmail.com"},
+    "core": {"editor": "vim"},
+    "init": {"defaultBranch": "main"},
+}
 
 # ---------------------------------------------------------------------------
 # Step definitions — add or edit steps here
 # ---------------------------------------------------------------------------
 
 # Optional: set to True to not abort the script when this step fails
-# Skip: use "skip_if" with a callable that returns True to skip the step
-# Custom: use "run" with a callable instead of "commands"
-
-
-def _all_steps() -> list[dict]:
-    return [
-        {
-            "name": "Install apt packages",
-            "commands": [
-                "sudo apt update",
-                "sudo apt install -y chrome-gnome-shell curl git vim zsh fish "
-                "fonts-powerline xfce4-terminal nodejs npm locate gnome-tweaks "
-                "gnome-shell-extensions libfuse2t64 build-essential ffmpeg cmake ranger "
-                "python3-pip",
-            ],
-        },
-        {
-            "name": "Install Neovim (apt + latest AppImage in ~/.local/bin) & Lazyvim",
-            "commands": [
-                "mkdir -p ~/.local/bin",
-                "cd ~/.local/bin && curl -fLO "
-                "https://github.com/neovim/neovim/releases/latest/download/nvim-linux-x86_64.appimage",
-                "chmod u+x ~/.local/bin/nvim-linux-x86_64.appimage",
-                "mv ~/.local/bin/nvim-linux-x86_64.appimage ~/.local/bin/nvim",
-                "git clone https://github.com/LazyVim/starter ~/.config/nvim",
-            ],
-        },
-        {"name": "Update locate DB", "commands": ["sudo updatedb"]},
-        {
-            "name": "Install uv (Astral)",
-            "commands": [
+# Skip: use skip_if with a callable that returns True to skip the step
+# Custom: use run with a callable instead of commands
+# Commands: a tuple[str, ...] argv runs directly; a str goes through the shell, so
+# only use one when shell features (pipes, $(...), eval) are needed
+# Ordering: depends_on lists the ids of earlier steps that must finish
+# first; steps whose dependencies are all done run concurrently
+# Progress: set to True to print a throttled "[name] <last output line>"
+# while a long-running command works (full output would interleave between
+# concurrently running steps)
+
+
+@dataclass(frozen=True, slots=True)
+class Step:
+    id: str
+    name: str
+    depends_on: tuple[str, ...] = ()
+    commands: tuple[str | tuple[str, ...], ...] = ()
+    run: Callable[[], bool] | None = None
+    skip_if: Callable[[], bool] | None = None
+    optional: bool = False
+    show_output: bool = False
+    progress: bool = False
+
+
+def _all_steps() -> tuple[Step, ...]:
+    return (
+        Step(
+            id="dns",
+            name="Pre-resolve download hostnames",
+            optional=True,
+            run=_prewarm_dns,
+        ),
+        Step(
+            id="apt",
+            name="Install apt packages",
+            depends_on=("dns",),
+            progress=True,
+            skip_if=lambda: _all_installed(APT_PACKAGES),
+            # eatmydata + --force-unsafe-io skip dpkg's per-package fsync;
+            # the Acquire options pipeline downloads from the mirror
+            commands=(
+                ("sudo", "apt-get", "update", "-qq"),
+                ("sudo", "apt-get", "install", "-y", "--no-install-recommends", "eatmydata"),
+                (
+                    "sudo", "DEBIAN_FRONTEND=noninteractive", "eatmydata", "apt-get", "install", "-y",
+                    "-o", "Dpkg::Options::=--force-unsafe-io",
+                    "-o", "Acquire::Queue-Mode=host", "-o", "Acquire::http::Pipeline-Depth=10",
+                    *APT_PACKAGES,
+                ),
+            ),
+        ),
+        Step(
+            id="nvim",
+            name="Install Neovim (apt + latest AppImage in ~/.local/bin) & Lazyvim",
+            depends_on=("apt",),
+            commands=(
+                ("mkdir", "-p", f"{HOME}/.local/bin"),
+                (
+                    "curl", "-fL", "-o", f"{HOME}/.local/bin/nvim-linux-x86_64.appimage",
+                    "https://github.com/neovim/neovim/releases/latest/download/nvim-linux-x86_64.appimage",
+                ),
+                ("chmod", "u+x", f"{HOME}/.local/bin/nvim-linux-x86_64.appimage"),
+                ("mv", f"{HOME}/.local/bin/nvim-linux-x86_64.appimage", f"{HOME}/.local/bin/nvim"),
+                ("git", "clone", "https://github.com/LazyVim/starter", f"{HOME}/.config/nvim"),
+            ),
+        ),
+        Step(
+            id="updatedb",
+            name="Update locate DB",
+            depends_on=("apt",),
+            commands=(("sudo", "updatedb"),),
+        ),
+        Step(
+            id="uv",
+            name="Install uv (Astral)",
+            depends_on=("apt",),
+            commands=(
                 "curl -LsSf https://astral.sh/uv/install.sh | sh",
-            ],
-        },
-        {
-            "name": "Create SSH key (ed25519)",
-            "skip_if": lambda: os.path.exists(f"{HOME}/.ssh/id_ed25519"),
-            "commands": [
-                f'ssh-keygen -t ed25519 -C "aniket.dhere@gmail.com" -f {HOME}/.ssh/id_ed25519 -N ""',
-            ],
-        },
-        {
-            "name": "Start ssh-agent and add key",
-            "commands": [
+            ),
+        ),
+        Step(
+            id="ssh-key",
+            name="Create SSH key (ed25519)",
+            skip_if=lambda: _file_exists(SSH_KEY_STR),
+            commands=(
+                ("ssh-keygen", "-t", "ed25519", "-C", "aniket.dhere@gmail.com", "-f", SSH_KEY_STR, "-N", ""),
+            ),
+        ),
+        Step(
+            id="ssh-agent",
+            name="Start ssh-agent and add key",
+            depends_on=("ssh-key",),
+            commands=(
                 'eval "$(ssh-agent -s)" && ssh-add ~/.ssh/id_ed25519',
-            ],
-        },
-        {
-            "name": "Show SSH public key",
-            "show_output": True,
-            "commands": ["cat ~/.ssh/id_ed25519.pub"],
-        },
-        {
-            "name": "Git config (name, email, editor)",
-            "commands": [
-                'git config --global user.name "Aniket Dhere"',
-                'git config --global user.email "aniket.dhere@gmail.com"',
-                'git config --global core.editor "vim"',
-                'git config --global init.defaultBranch main',
-            ],
-        },
-        {
-            "name": "Install Nerd Font (DroidSansMono)",
-            "commands": [
-                "mkdir -p ~/.local/share/fonts",
-                "cd ~/.local/share/fonts && curl -fLO "
-                "https://github.com/ryanoasis/nerd-fonts/raw/HEAD/patched-fonts/DroidSansMono/DroidSansMNerdFont-Regular.otf",
-            ],
-        },
-        {
-            "name": "Install Oh My Zsh",
-            "commands": [
-                'RUNZSH=no sh -c "$(curl -fsSL https://raw.githubusercontent.com/ohmyzsh/ohmyzsh/master/tools/install.sh)"',
-            ],
-        },
-        {
-            "name": "Set ZSH theme to agnoster and DEFAULT_USER",
-            "run": _set_zsh_theme,
-        },
-        {
-            "name": "Install Oh My Fish",
-            "optional": True,
-            "commands": [
-                "curl -sS https://raw.githubusercontent.com/oh-my-fish/oh-my-fish/master/bin/install | fish",
-            ],
-        },
-        {
-            "name": "Install Fish theme (bobthefish)",
-            "optional": True,
-            "commands": [
-                "fish -c 'omf install bobthefish'",
-            ],
-        },
-        {
-            "name": "Configure Fish theme (nerd fonts)",
-            "run": _append_fish_theme,
-        },
-        {
-            "name": "Clone update-cursor and move to /opt",
-            "commands": [
-                "cd ~ && git clone git@github.com:s0m3OnE47/update-cursor.git",
-                "sudo mv ~/update-cursor /opt",
-            ],
-        },
-        {
-            "name": "Append PATH and autocomplete to ~/.zshrc",
-            "run": _append_zshrc,
-        },
-        {
-            "name": "Run update-cursor",
-            "optional": True,
-            "commands": ["/opt/update-cursor/bin/update-cursor"],
-        },
-        {
-            "name": "Clone zsh-autocomplete and move to /opt",
-            "commands": [
-                "cd ~ && git clone --depth 1 https://github.com/marlonrichert/zsh-autocomplete.git",
-                "sudo mv ~/zsh-autocomplete /opt",
-            ],
-        },
-        {
-            "name": "Dash-to-dock: click to minimize",
-            "commands": [
-                "gsettings set org.gnome.shell.extensions.dash-to-dock click-action 'minimize'",
-            ],
-        },
-    ]
+            ),
+        ),
+        Step(
+            id="ssh-pubkey",
+            name="Show SSH public key",
+            depends_on=("ssh-key",),
+            show_output=True,
+            commands=(("cat", f"{SSH_KEY}.pub"),),
+        ),
+        Step(
+            id="git-config",
+            name="Git config (name, email, editor)",
+            depends_on=("apt",),
+            skip_if=_gitconfig_is_current,
+            run=_write_gitconfig,
+        ),
+        Step(
+            id="downloads",
+            name="Install Nerd Font (DroidSansMono) and download Oh My Zsh installer",
+            depends_on=("apt",),
+            # One curl invocation fetches both files concurrently; the Oh My Fish
+            # installer is fetched by its own optional step so it can't abort the run
+            commands=(
+                (
+                    "curl", "-fsSL", "--parallel", "--parallel-max", "4", "--create-dirs",
+                    "-o", str(NERD_FONT), NERD_FONT_URL,
+                    "-o", str(OMZ_INSTALLER), OMZ_INSTALLER_URL,
+                ),
+            ),
+        ),
+        Step(
+            id="omz",
+            name="Install Oh My Zsh",
+            depends_on=("downloads",),
+            commands=(
+                # CHSH=no: the installer would otherwise ask; the next step changes it
+                ("env", "RUNZSH=no", "CHSH=no", "sh", str(OMZ_INSTALLER)),
+            ),
+        ),
+        Step(
+            id="chsh",
+            name="Set login shell to zsh",
+            depends_on=("omz",),
+            skip_if=lambda: pwd.getpwnam(USER).pw_shell == ZSH_PATH,
+            commands=(("sudo", "chsh", "-s", ZSH_PATH, USER),),
+        ),
+        Step(
+            id="zsh-theme",
+            name="Set ZSH theme to agnoster and DEFAULT_USER",
+            depends_on=("omz",),
+            run=_set_zsh_theme,
+        ),
+        Step(
+            id="omf",
+            name="Install Oh My Fish",
+            depends_on=("apt",),
+            optional=True,
+            commands=(
+                ("curl", "-fsSL", "--create-dirs", "-o", str(OMF_INSTALLER), OMF_INSTALLER_URL),
+                ("fish", str(OMF_INSTALLER)),
+            ),
+        ),
+        Step(
+            id="bobthefish",
+            name="Install Fish theme (bobthefish)",
+            depends_on=("omf",),
+            optional=True,
+            commands=(
+                ("fish", "-c", "omf install bobthefish"),
+            ),
+        ),
+        Step(
+            id="fish-theme",
+            name="Configure Fish theme (nerd fonts)",
+            depends_on=("bobthefish",),
+            run=_append_fish_theme,
+        ),
+        Step(
+            id="clone-repos",
+            name="Clone update-cursor and zsh-autocomplete and move to /opt",
+            depends_on=("apt", "ssh-agent"),
+            run=_clone_repos_parallel,
+        ),
+        Step(
+            id="zshrc-append",
+            name="Append PATH and autocomplete to ~/.zshrc",
+            depends_on=("zsh-theme",),
+            run=_append_zshrc,
+        ),
+        Step(
+            id="run-update-cursor",
+            name="Run update-cursor",
+            depends_on=("clone-repos",),
+            optional=True,
+            commands=(("/opt/update-cursor/bin/update-cursor",),),
+        ),
+        Step(
+            id="dash-to-dock",
+            name="Dash-to-dock: click to minimize",
+            depends_on=("apt",),
+            commands=(
+                ("gsettings", "set", "org.gnome.shell.extensions.dash-to-dock", "click-action", "minimize"),
+            ),
+        ),
+    )
 
 
-def _append_fish_theme() -> bool:
-    """Append bobthefish theme settings to Fish config."""
-    fish_config = f"{HOME}/.config/fish/config.fish"
-    theme_lines = "\nset -g theme_powerline_fonts no\nset -g theme_nerd_fonts yes\n"
-    os.makedirs(os.path.dirname(fish_config), exist_ok=True)
+def _prewarm_dns() -> bool:
+    """Resolve PREWARM_HOSTS concurrently so later curl/git/apt lookups hit the system resolver cache."""
+    def resolve(host: str) -> str | None:
+        try:
+            socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            return f"{host}: {e}"
+        return None
+
+    with ThreadPoolExecutor(max_workers=len(PREWARM_HOSTS)) as pool:
+        errors = [err for err in pool.map(resolve, PREWARM_HOSTS) if err]
+    if errors:
+        raise RuntimeError("\n".join(errors))
+    return True
+
+
+def _file_exists(path: str | Path) -> bool:
+    """lstat-based existence check. Only a missing file counts as absent; other errors (e.g. permissions) propagate."""
     try:
-        with open(fish_config) as f:
+        os.lstat(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _all_installed(packages: tuple[str, ...]) -> bool:
+    """True if dpkg reports every package as installed (one dpkg-query call for all of them)."""
+    r = subprocess.run(
+        ["dpkg-query", "-W", "-f=${Package} ${Status}\n", *packages],
+        capture_output=True,
+        text=True,
+    )
+    lines = r.stdout.splitlines()
+    # Unknown packages make dpkg-query exit non-zero and print nothing for them
+    return (
+        r.returncode == 0
+        and len(lines) == len(packages)
+        and all(line.endswith("install ok installed") for line in lines)
+    )
+
+
+def _append_once(path: Path, marker: str, block: str) -> bool:
+    """Append block to path unless marker is already in the file, so re-runs don't duplicate it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(path) as f:
             content = f.read()
     except FileNotFoundError:
         content = ""
-    if "theme_powerline_fonts" in content:
+    if marker in content:
+        return True
+    with open(path, "a") as f:
+        f.write(block)
+    return True
+
+
+def _append_fish_theme() -> bool:
+    """Append bobthefish theme settings to Fish config."""
+    theme_lines = "\nset -g theme_powerline_fonts no\nset -g theme_nerd_fonts yes\n"
+    return _append_once(FISH_CFG, "theme_powerline_fonts", theme_lines)
+
+
+def _missing_gitconfig() -> list[tuple[str, str]]:
+    """(key, value) pairs from GIT_CONFIG that the global git config doesn't already have."""
+    wanted = [
+        (f"{section}.{key}", value)
+        for section, values in GIT_CONFIG.items()
+        for key, value in values.items()
+    ]
+    if not _file_exists(GITCONFIG):
+        return wanted
+    r = subprocess.run(["git", "config", "--global", "--list"], capture_output=True, text=True)
+    if r.returncode != 0:
+        raise RuntimeError(r.stderr.strip() or f"git config --global --list exited with {r.returncode}")
+    # git prints section/key names lowercased; for repeated keys the last one wins
+    current = dict(line.split("=", 1) for line in r.stdout.splitlines() if "=" in line)
+    return [(key, value) for key, value in wanted if current.get(key.lower()) != value]
+
+
+def _gitconfig_is_current() -> bool:
+    """True if the global git config already has every value in GIT_CONFIG."""
+    return not _missing_gitconfig()
+
+
+def _write_gitconfig() -> bool:
+    """Create ~/.gitconfig from GIT_CONFIG, or set the missing values with git config if it already exists.
+
+    An existing file is never re-serialized, so its comments, repeated keys and symlink are left alone.
+    """
+    if not _file_exists(GITCONFIG):
+        lines = []
+        for section, values in GIT_CONFIG.items():
+            lines.append(f"[{section}]")
+            lines.extend(f"\t{key} = {value}" for key, value in values.items())
+        tmp_path = GITCONFIG.with_name(".gitconfig.tmp")
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, GITCONFIG)
+        return True
+    for key, value in _missing_gitconfig():
+        ok, out = _run_cmd(["git", "config", "--global", key, value])
+        if not ok:
+            raise RuntimeError(out or f"git config --global {key} failed")
+    return True
+
+
+def _clone_repos_parallel() -> bool:
+    """Shallow-clone CLONE_REPOS concurrently and move the ones that succeeded to /opt with one sudo mv.
+
+    Repos already in /opt are skipped. Clones go to a temporary directory that is removed afterwards,
+    so a failed clone leaves nothing behind to break the next run.
+    """
+    pending: dict[str, str] = {}
+    for url in CLONE_REPOS:
+        name = url.rsplit("/", 1)[-1].removesuffix(".git")
+        if not os.path.isdir(f"/opt/{name}"):
+            pending[name] = url
+    if not pending:
         return True
-    with open(fish_config, "a") as f:
-        f.write(theme_lines)
+    DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=DOWNLOAD_DIR) as tmp:
+        with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+            results = list(
+                pool.map(
+                    lambda item: _run_cmd(
+                        [
+                            "env", f"GIT_SSH_COMMAND={GIT_SSH_COMMAND}",
+                            "git", "clone", "--depth=1", "--single-branch", item[1], f"{tmp}/{item[0]}",
+                        ]
+                    ),
+                    pending.items(),
+                )
+            )
+        errors = [f"{name}: {out}" for name, (ok, out) in zip(pending, results) if not ok]
+        cloned = [f"{tmp}/{name}" for name, (ok, _) in zip(pending, results) if ok]
+        if cloned:
+            ok, out = _run_cmd(["sudo", "mv", *cloned, "/opt"])
+            if not ok:
+                errors.append(out)
+    if errors:
+        raise RuntimeError("\n".join(errors))
     return True
 
 
 def _set_zsh_theme() -> bool:
     """Set ZSH_THEME=\"agnoster\" and add DEFAULT_USER=\"$(whoami)\" in ~/.zshrc."""
-    zshrc_path = f"{HOME}/.zshrc"
     try:
-        with open(zshrc_path) as f:
+        with open(ZSHRC) as f:
             content = f.read()
     except FileNotFoundError:
         return True  # .zshrc not created yet (e.g. Oh My Zsh failed)
@@ -183,31 +436,32 @@ def _set_zsh_theme() -> bool:
             content,
             count=1,
         )
-    with open(zshrc_path, "w") as f:
+    with open(ZSHRC, "w") as f:
         f.write(content)
     return True
 
 
 def _append_zshrc() -> bool:
     """Append PATH and zsh-autocomplete source to ~/.zshrc."""
-    zshrc_path = f"{HOME}/.zshrc"
     block = """
 # Added by setup_ubuntu.py
 export PATH="$HOME/.local/bin:$PATH"
 export PATH="/opt/update-cursor/bin:$PATH"
 source /opt/zsh-autocomplete/zsh-autocomplete.plugin.zsh
 """
-    with open(zshrc_path, "a") as f:
-        f.write(block)
-    return True
+    return _append_once(ZSHRC, "# Added by setup_ubuntu.py", block)
 
 
-# Build flat list of steps (so we can index and count)
-def _build_steps() -> list[dict]:
-    return _all_steps()
+STEPS = _all_steps()
 
+# Most steps are network/subprocess bound, so threads are enough
+MAX_WORKERS = 8
 
-STEPS = _build_steps()
+# Lines of command output kept for the failure message
+OUTPUT_TAIL_LINES = 20
+
+# Minimum seconds between progress lines of a progress=True step
+PROGRESS_INTERVAL = 2.0
 
 # ---------------------------------------------------------------------------
 # Runner: progress, run, report
@@ -224,27 +478,78 @@ class Result:
     optional: bool = False
 
 
-def _run_cmd(cmd: str, env: dict, capture: bool = True) -> tuple[bool, str]:
-    """Run a single command. Return (success, stderr_or_empty). If not capture, stdout is shown."""
-    r = subprocess.run(
-        cmd,
-        shell=True,
-        cwd=HOME,
-        env=env,
-        capture_output=capture,
-        text=True,
-    )
-    if capture:
-        return (r.returncode == 0, (r.stderr or "").strip() or (r.stdout or "").strip())
-    return (r.returncode == 0, "")
+def _run_cmd(
+    cmd: str | Sequence[str], show_output: bool = False, progress_label: str | None = None
+) -> tuple[bool, str]:
+    """Run a single command. Return (success, last_output_lines_on_failure). If show_output, lines are printed live."""
+    returncode, out = _stream_cmd(cmd, show_output, progress_label)
+    return (returncode == 0, out)
 
 
-def _run_step(step: dict, index: int, total: int, env: dict) -> Result:
-    name = step["name"]
-    optional = step.get("optional", False)
+def _stream_cmd(
+    cmd: str | Sequence[str], show_output: bool = False, progress_label: str | None = None
+) -> tuple[int, str]:
+    """Run a single command. Return (exit_code, last_output_lines_on_failure).
 
-    if step.get("skip_if"):
-        if step["skip_if"]():
+    With progress_label, the latest output line is printed as "[label] line" at
+    most every PROGRESS_INTERVAL seconds.
+
+    A str is run through the shell (bash when it chains with &&); an argv sequence is exec'd directly.
+    Output is streamed, so only the last OUTPUT_TAIL_LINES lines are ever kept in memory.
+    """
+    shell = isinstance(cmd, str)
+    tail: deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            shell=shell,
+            executable="/bin/bash" if shell and "&&" in cmd else None,
+            cwd=HOME,
+            # Steps run concurrently with output piped away, so nothing may prompt on stdin
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+    except OSError as e:
+        # Missing/non-executable argv[0]; report it like the shell would (exit 127)
+        return (127, str(e))
+    last_progress = time.monotonic()
+    with proc:
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            if show_output:
+                print(f"    {line}")
+            elif progress_label and line and time.monotonic() - last_progress >= PROGRESS_INTERVAL:
+                last_progress = time.monotonic()
+                print(f"    [{progress_label}] {line[:100]}")
+            tail.append(line)
+        returncode = proc.wait()
+    if returncode == 0:
+        return (0, "")
+    return (returncode, "\n".join(tail).strip())
+
+
+def _run_step(step: Step, index: int, total: int) -> Result:
+    """Run one step. Safe to call from worker threads: apart from live show_output
+    and progress lines nothing is printed here, the command transcript is returned in Result.message."""
+    name = step.name
+    optional = step.optional
+
+    if step.skip_if:
+        try:
+            skip = step.skip_if()
+        except Exception as e:
+            return Result(
+                step_name=name,
+                step_index=index,
+                total=total,
+                status="failed",
+                message=f"skip_if: {e}",
+                optional=optional,
+            )
+        if skip:
             return Result(
                 step_name=name,
                 step_index=index,
@@ -253,10 +558,9 @@ def _run_step(step: dict, index: int, total: int, env: dict) -> Result:
                 message="condition matched",
             )
 
-    if "run" in step:
-        fn: Callable[[], bool] = step["run"]
+    if step.run:
         try:
-            ok = fn()
+            ok = step.run()
             return Result(
                 step_name=name,
                 step_index=index,
@@ -275,19 +579,20 @@ def _run_step(step: dict, index: int, total: int, env: dict) -> Result:
                 optional=optional,
             )
 
-    commands = step.get("commands", [])
     # Show command output for steps that print something useful (e.g. SSH pub key)
-    show_output = step.get("show_output", False)
-    for cmd in commands:
-        print(f"    $ {cmd}")
-        ok, err = _run_cmd(cmd, env, capture=not show_output)
+    show_output = step.show_output
+    transcript: list[str] = []
+    for cmd in step.commands:
+        shown = cmd if isinstance(cmd, str) else shlex.join(cmd)
+        transcript.append(f"$ {shown}")
+        ok, out = _run_cmd(cmd, show_output=show_output, progress_label=step.name if step.progress else None)
         if not ok:
             return Result(
                 step_name=name,
                 step_index=index,
                 total=total,
                 status="failed",
-                message=err or f"exit code non-zero",
+                message=f"$ {shown}\n{out or 'exit code non-zero'}",
                 optional=optional,
             )
     return Result(
@@ -295,15 +600,38 @@ def _run_step(step: dict, index: int, total: int, env: dict) -> Result:
         step_index=index,
         total=total,
         status="ok",
+        message="\n".join(transcript),
         optional=optional,
     )
 
 
+def _step_levels(steps: tuple[Step, ...]) -> list[list[int]]:
+    """Group step indices (1-based) into levels by depends_on.
+
+    Every step in a level only depends on steps in earlier levels, so a level
+    can run concurrently. Dependencies must refer to earlier steps.
+    """
+    depth: dict[str, int] = {}
+    levels: list[list[int]] = []
+    for i, step in enumerate(steps, start=1):
+        for dep in step.depends_on:
+            if dep not in depth:
+                raise ValueError(f"Step {step.name!r} depends on unknown or later step {dep!r}")
+        level = max((depth[dep] + 1 for dep in step.depends_on), default=0)
+        depth[step.id] = level
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(i)
+    return levels
+
+
 def _print_result(r: Result) -> None:
     total = r.total
     n = r.step_index
     name = r.step_name
     if r.status == "ok":
+        for line in r.message.split("\n") if r.message else []:
+            print(f"    {line}")
         print(f"  [{n}/{total}] {name} — OK")
     elif r.status == "skipped":
         print(f"  [{n}/{total}] {name} — SKIPPED ({r.message})")
@@ -311,12 +639,17 @@ def _print_result(r: Result) -> None:
         opt = " (optional)" if r.optional else ""
         print(f"  [{n}/{total}] {name} — FAILED{opt}")
         if r.message:
-            for line in r.message.strip().split("\n")[:5]:
+            lines = r.message.strip().split("\n")
+            if len(lines) > 5:
+                # keep the "$ cmd" line and the end of its output
+                lines = lines[:1] + lines[-4:]
+            for line in lines:
                 print(f"      {line}")
 
 
 def main() -> None:
-    env = {**os.environ, "HOME": HOME}
+    # Set once so every subprocess inherits it without building a fresh env dict
+    os.environ["HOME"] = HOME
     total = len(STEPS)
     results: list[Result] = []
 
@@ -324,19 +657,46 @@ def main() -> None:
     print(" Ubuntu setup script")
     print("=" * 60)
 
-    for i, step in enumerate(STEPS, start=1):
-        name = step["name"]
-        print(f"\n[{i}/{total}] {name} …")
-        r = _run_step(step, i, total, env)
-        results.append(r)
-        _print_result(r)
-
-        if r.status == "failed" and not r.optional:
-            print("\n>>> Aborting due to failed required step.")
-            _print_summary(results, total)
-            sys.exit(1)
+    # Ask for the sudo password once, up front: concurrent sudo calls would
+    # otherwise each prompt on the terminal
+    if subprocess.run(["sudo", "-v"]).returncode != 0:
+        print("\n>>> sudo authentication failed.")
+        sys.exit(1)
+
+    # ids of failed required steps and of everything that (transitively) needs them
+    blocked: set[str] = set()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        for level in _step_levels(STEPS):
+            runnable = [i for i in level if not blocked.intersection(STEPS[i - 1].depends_on)]
+            print()
+            for i in level:
+                print(f"[{i}/{total}] {STEPS[i - 1].name} …")
+            # map() yields in submission order, so output stays in step order
+            level_results = dict(
+                zip(runnable, pool.map(lambda i: _run_step(STEPS[i - 1], i, total), runnable))
+            )
+            for i in level:
+                step = STEPS[i - 1]
+                r = level_results.get(i)
+                if r is None:
+                    failed_deps = ", ".join(dep for dep in step.depends_on if dep in blocked)
+                    r = Result(
+                        step_name=step.name,
+                        step_index=i,
+                        total=total,
+                        status="skipped",
+                        message=f"blocked by {failed_deps}",
+                    )
+                    blocked.add(step.id)
+                elif r.status == "failed" and not r.optional:
+                    blocked.add(step.id)
+                results.append(r)
+                _print_result(r)
 
     _print_summary(results, total)
+    if any(r.status == "failed" and not r.optional for r in results):
+        print("\n>>> A required step failed; steps that depend on it were skipped.")
+        sys.exit(1)
     print("\n>>> Done. Restart your shell or run: source ~/.zshrc")
     print(">>> Add your SSH public key to GitHub if needed (it was printed above).")
 